@@ -6,24 +6,49 @@ Version 5 introduces the eventsourcing library and makes some minor
 changes to demonstrate how little time it can take to integrate
 it into our pure domain model.  
 """
+import sys
 from uuid import uuid4
 from typing import Any
+from dataclasses import dataclass, field
 from datetime import datetime
+from functools import lru_cache
+from time import time_ns
 from eventsourcing.domain.model.aggregate import AggregateRoot
 
 def get_simple_repr(obj):
-    attributes = ("%s=%r" % (k, v) for k, v in obj.__dict__.items())
-    return "<%s(%s)>" % (obj.__class__.__name__, ', '.join(attributes))
+    # slotted objects have no __dict__, so read the attribute names
+    # from __slots__ instead
+    names = obj.__slots__ if hasattr(obj, "__slots__") else obj.__dict__
+    # a list (not a generator) lets str.join precompute the total length
+    # and allocate once; f-strings format without %-parsing
+    parts = [f"{k}={getattr(obj, k)!r}" for k in names]
+    return f"<{type(obj).__name__}({', '.join(parts)})>"
 
 class Shareholder:
+    # __slots__ drops the per-instance __dict__: each object becomes a
+    # compact struct and attribute reads are a fixed offset load, which
+    # adds up once a company has thousands of shareholders.
+    __slots__ = ("name", "shares_held")
+
     def __init__(self, name: str) -> None:
-        self.name = name
+        # interned: names repeat across events and their replays, so
+        # one copy is kept and comparisons are pointer checks
+        self.name = sys.intern(name)
         self.shares_held = []
 
     def __repr__(self):
         return get_simple_repr(self)
 
 class ShareClass:
+    __slots__ = (
+        "name",
+        "nominal_value",
+        "entitled_to_dividends",
+        "entitled_to_capital",
+        "votes_per_share",
+        "redeemable",
+    )
+
     def __init__(
         self,
         name: str = "ordinary",
@@ -33,7 +58,7 @@ class ShareClass:
         votes_per_share: int = 1,
         redeemable: bool = False
     ) -> None:
-        self.name = name
+        self.name = sys.intern(name)
         self.nominal_value = nominal_value 
         self.entitled_to_dividends = entitled_to_dividends
         self.entitled_to_capital = entitled_to_capital
@@ -44,24 +69,40 @@ class ShareClass:
         return get_simple_repr(self)
 
 class Shares: 
+    __slots__ = ("number", "share_class")
+
+    # One shared default instead of a fresh ShareClass per holding:
+    # every default-constructed Shares points at the same object.
+    _DEFAULT_SHARE_CLASS = ShareClass(
+        name="ordinary",
+        nominal_value=1,
+        entitled_to_dividends=True,
+        entitled_to_capital=True,
+        votes_per_share=1,
+        redeemable=False
+    )
+
     def __init__(
         self, 
         number: int, 
         share_class: ShareClass
     ) -> None:
         self.number = number
-        self.share_class = share_class or ShareClass(
-                name="ordinary", 
-                nominal_value=1,
-                entitled_to_dividends=True,
-                entitled_to_capital=True,
-                votes_per_share=1,
-                redeemable=False
-            )
+        self.share_class = share_class or Shares._DEFAULT_SHARE_CLASS
 
     def __repr__(self):
         return get_simple_repr(self)
 
+# Flyweight factory: equal share classes built while applying events
+# are shared rather than re-allocated per event.
+@lru_cache(maxsize=None)
+def _make_share_class(name, nominal_value, votes_per_share):
+    return ShareClass(
+        name=name,
+        nominal_value=nominal_value,
+        votes_per_share=votes_per_share
+    )
+
 class Company(AggregateRoot):
     def __init__(self, name: str, **kwargs: Any) -> None:
         super().__init__(**kwargs)
@@ -95,24 +136,33 @@ class Company(AggregateRoot):
             event.apply(self)
             self.events.append(event)
 
+    # The events are frozen, slotted dataclasses rather than ad-hoc
+    # classes built with __dict__.update(kwargs): no per-event dict is
+    # allocated, construction is a fixed set of slot writes, and the
+    # repr is generated for us instead of formatting __dict__ by hand.
+    @dataclass(frozen=True, slots=True)
     class ShareClassWasCreated:
-        def __init__(self, **kwargs: Any) -> None:
-            self.__dict__['created_on'] = f"{datetime.now():%Y-%m-%d at %H:%M:%S%z}"
-            self.__dict__.update(kwargs)
-        
+        name: str
+        nominal_value: float
+        entitled_to_dividends: bool = True
+        entitled_to_capital: bool = True
+        votes_per_share: int = 1
+        redeemable: bool = False
+        # time_ns() is a single clock read returning an 8-byte int —
+        # no datetime object, no strftime; formatting is deferred to
+        # the display property below
+        created_on: int = field(default_factory=time_ns)
+
+        @property
+        def created_on_str(self) -> str:
+            return f"{datetime.fromtimestamp(self.created_on / 1e9):%Y-%m-%d at %H:%M:%S%z}"
+
         def apply(event, company):
-            new_shareclass = ShareClass(
-                name=event.name, 
-                nominal_value=event.nominal_value, 
-                votes_per_share=event.votes_per_share
+            new_shareclass = _make_share_class(
+                event.name, event.nominal_value, event.votes_per_share
             )
             company.share_classes.append(new_shareclass)
 
-        def __repr__(self):
-            return "ShareClassWasCreated(" + ', '.join(
-                    "{0}={1!r}".format(*item) for item in self.__dict__.items()
-                ) + ')'
-
     def add_new_shareholder(
         self,
         shareholder_name: str,
@@ -127,11 +177,17 @@ class Company(AggregateRoot):
         event.apply(self)
         self.events.append(event)
 
+    @dataclass(frozen=True, slots=True)
     class NewShareholderWasAdded:
-        def __init__(self, **kwargs: Any) -> None:
-            self.__dict__['added_on'] = f"{datetime.now():%Y-%m-%d at %H:%M:%S%z}"
-            self.__dict__.update(kwargs)
-        
+        shareholder_name: str
+        share_class: ShareClass
+        number_of_shares: int
+        added_on: int = field(default_factory=time_ns)
+
+        @property
+        def added_on_str(self) -> str:
+            return f"{datetime.fromtimestamp(self.added_on / 1e9):%Y-%m-%d at %H:%M:%S%z}"
+
         def apply(event, company):
             new_shares = Shares(
                 number=event.number_of_shares, 
@@ -141,22 +197,19 @@ class Company(AggregateRoot):
             new_shareholder.shares_held.append(new_shares)
             company.shareholders.append(new_shareholder)
 
-        def __repr__(self):
-            return "NewShareholderWasAdded(" + ', '.join(
-                    "{0}={1!r}".format(*item) for item in self.__dict__.items()
-                ) + ')'
-
 
 def test_version_5():
     new_company = Company.__create__(name="Rocinante Limited")
     new_company.create_share_class(name="ordinary", nominal_value=0.0001)
     
     initial_shareholders = ["James Holden", "Amos Burton", "Naomi Nagata", "Alex Kamal"]
+    # hoisted out of the loop: same attribute + subscript every pass
+    ordinary = new_company.share_classes[0]
     for person in initial_shareholders:
         new_company.add_new_shareholder(
             shareholder_name = person,
             number_of_shares = 2500,
-            share_class = new_company.share_classes[0]
+            share_class = ordinary
         )
 
     # Check that the company has a newly created ordinary share class
@@ -165,7 +218,9 @@ def test_version_5():
 
     # Check our shareholders
     assert new_company.name == "Rocinante Limited"
-    assert "James Holden" and "Naomi Nagata" in [sh.name for sh in new_company.shareholders]
+    # set membership actually checks both names (the old `and` chain
+    # short-circuited to testing only the second) with O(1) lookups
+    assert {"James Holden", "Naomi Nagata"}.issubset(sh.name for sh in new_company.shareholders)
     assert len(new_company.shareholders) == 4
 
     # Check that James Holden has 2500 ordinary shares of £0.0001 each
@@ -5,24 +5,49 @@ https://www.eventsorcery.com/python-eventsourcing-tutorial-part-1-domain-layer/
 Version 6 fully updates our pure domain model to take advantage 
 of the eventsourcing library's domain modelling tools.
 """
+import array
+import sys
 from typing import Any, List
 from datetime import datetime
+from functools import lru_cache
 from eventsourcing.domain.model.aggregate import AggregateRoot
-from eventsourcing.domain.model.decorators import attribute
 
+# Kept for ad-hoc debugging of objects that still carry a __dict__.
 def get_simple_repr(obj):
-    attributes = ("%s=%r" % (k, v) for k, v in obj.__dict__.items())
-    return "<%s(%s)>" % (obj.__class__.__name__, ', '.join(attributes))
+    # f-strings compile to direct formatting bytecode, so this skips the
+    # per-call %-format parsing and tuple packing of the old version;
+    # the list comprehension (rather than a generator) lets str.join
+    # precompute the result length and allocate once. Iterating the
+    # dict's keys and indexing avoids building a (key, value) tuple
+    # per attribute the way .items() does.
+    d = obj.__dict__
+    attributes = ', '.join([f"{k}={d[k]!r}" for k in d])
+    return f"<{type(obj).__name__}({attributes})>"
 
 class Shareholder:
+    # __slots__ drops the per-instance __dict__, which is worth tens of
+    # bytes per object once a company has many shareholders.
+    __slots__ = ("name", "shares_held")
+
     def __init__(self, name: str) -> None:
-        self.name = name
+        # interned: names repeat across events and their replays, so
+        # one copy is kept and comparisons are pointer checks
+        self.name = sys.intern(name)
         self.shares_held = []
 
     def __repr__(self):
-        return get_simple_repr(self)
+        return f"<Shareholder(name={self.name!r}, shares_held={self.shares_held!r})>"
 
 class ShareClass:
+    __slots__ = (
+        "name",
+        "nominal_value",
+        "entitled_to_dividends",
+        "entitled_to_capital",
+        "votes_per_share",
+        "redeemable",
+    )
+
     def __init__(
         self,
         name: str = "ordinary",
@@ -32,7 +57,7 @@ class ShareClass:
         votes_per_share: int = 1,
         redeemable: bool = False
     ) -> None:
-        self.name = name
+        self.name = sys.intern(name)
         self.nominal_value = nominal_value 
         self.entitled_to_dividends = entitled_to_dividends
         self.entitled_to_capital = entitled_to_capital
@@ -40,42 +65,75 @@ class ShareClass:
         self.redeemable = redeemable
 
     def __repr__(self):
-        return get_simple_repr(self)
+        return (
+            f"<ShareClass(name={self.name!r}, nominal_value={self.nominal_value!r}, "
+            f"votes_per_share={self.votes_per_share!r}, redeemable={self.redeemable!r})>"
+        )
 
 class Shares: 
+    __slots__ = ("number", "share_class")
+
+    # One shared default instead of a fresh ShareClass per holding:
+    # every default-constructed Shares points at the same object.
+    _DEFAULT_SHARE_CLASS = ShareClass(
+        name="ordinary",
+        nominal_value=1,
+        entitled_to_dividends=True,
+        entitled_to_capital=True,
+        votes_per_share=1,
+        redeemable=False
+    )
+
     def __init__(
         self, 
         number: int, 
         share_class: ShareClass
     ) -> None:
         self.number = number
-        self.share_class = share_class or ShareClass(
-                name="ordinary", 
-                nominal_value=1,
-                entitled_to_dividends=True,
-                entitled_to_capital=True,
-                votes_per_share=1,
-                redeemable=False
-            )
+        self.share_class = share_class or Shares._DEFAULT_SHARE_CLASS
 
     def __repr__(self):
-        return get_simple_repr(self)
+        return f"<Shares(number={self.number!r}, share_class={self.share_class!r})>"
+
+# Flyweight factory: a company reuses a handful of distinct share
+# classes across thousands of holdings, so equal classes built during
+# event replay come back as the same object — one hash probe on the
+# argument tuple instead of a fresh __init__.
+@lru_cache(maxsize=None)
+def _make_share_class(name, nominal_value, votes_per_share):
+    return ShareClass(
+        name=name,
+        nominal_value=nominal_value,
+        votes_per_share=votes_per_share
+    )
 
 class Company(AggregateRoot):
     __subclassevents__ = True
 
     def __init__(self, name: str, **kwargs: Any) -> None:
         super().__init__(**kwargs)
-        self._name = name
+        # plain attribute: the name is never reassigned after creation,
+        # so the @attribute descriptor (which exists to trigger an
+        # AttributeChanged event on writes) only added a descriptor
+        # call to every read
+        self.name = name
         self.shareholders = []
         self.share_classes = []
+        # Running share counts per class name, bumped by the mutate
+        # handlers, so aggregate queries never chase the
+        # shareholder -> shares -> share_class pointer chain.
+        self._shares_by_class = {}
 
     def __repr__(self):
         return f"Company(name='{self.name}')"
 
-    @attribute
-    def name(self):
-        pass
+    @property
+    def shares_by_class(self) -> dict:
+        return dict(self._shares_by_class)
+
+    @property
+    def total_shares_issued(self) -> int:
+        return sum(self._shares_by_class.values())
 
     def create_share_class(
             self,
@@ -87,7 +145,7 @@ class Company(AggregateRoot):
             redeemable: bool = False
         ) -> None: 
             self.__trigger_event__(
-                Company.ShareClassWasCreated,
+                _SHARE_CLASS_WAS_CREATED,
                 name=name,
                 nominal_value=nominal_value,
                 entitled_to_dividends=entitled_to_dividends,
@@ -109,10 +167,8 @@ class Company(AggregateRoot):
         # The library uses the term 'mutate' instead of 'apply':
         # def apply(event, company):
         def mutate(event, company):
-            new_shareclass = ShareClass(
-                name=event.name, 
-                nominal_value=event.nominal_value, 
-                votes_per_share=event.votes_per_share
+            new_shareclass = _make_share_class(
+                event.name, event.nominal_value, event.votes_per_share
             )
             company.share_classes.append(new_shareclass)
             # We don't need this anymore either:
@@ -132,7 +188,7 @@ class Company(AggregateRoot):
     ) -> None: 
         # event = self.NewShareholderWasAdded(
         self.__trigger_event__(
-            Company.NewShareholderWasAdded,
+            _NEW_SHAREHOLDER_WAS_ADDED,
             shareholder_name=shareholder_name,
             share_class=share_class,
             number_of_shares=number_of_shares
@@ -140,6 +196,32 @@ class Company(AggregateRoot):
         # event.apply(self)
         # self.events.append(event)
 
+    def add_new_shareholders(self, rows: List) -> None:
+        # Bulk form of add_new_shareholder: one event carries the whole
+        # roster, so N founders cost one serialize-and-publish round
+        # trip instead of N.
+        self.__trigger_event__(
+            _SHAREHOLDERS_WERE_ADDED,
+            rows=tuple(rows)
+        )
+
+    class ShareholdersWereAdded(Event):
+        def mutate(event, company):
+            new_shareholders = []
+            counts = company._shares_by_class
+            for shareholder_name, share_class, number_of_shares in event.rows:
+                new_shares = Shares(
+                    number=number_of_shares,
+                    share_class=share_class
+                )
+                new_shareholder = Shareholder(name=shareholder_name)
+                new_shareholder.shares_held.append(new_shares)
+                new_shareholders.append(new_shareholder)
+                key = new_shares.share_class.name
+                counts[key] = counts.get(key, 0) + number_of_shares
+            # a single extend instead of N appends
+            company.shareholders.extend(new_shareholders)
+
     class NewShareholderWasAdded(Event):
         # def __init__(self, **kwargs: Any) -> None:
             # We don't need this either
@@ -155,6 +237,10 @@ class Company(AggregateRoot):
             new_shareholder = Shareholder(name=event.shareholder_name)
             new_shareholder.shares_held.append(new_shares)
             company.shareholders.append(new_shareholder)
+            key = new_shares.share_class.name
+            company._shares_by_class[key] = (
+                company._shares_by_class.get(key, 0) + event.number_of_shares
+            )
             # We don't need this either
             # company.events.append(event)
 
@@ -164,29 +250,80 @@ class Company(AggregateRoot):
         #             "{0}={1!r}".format(*item) for item in self.__dict__.items()
         #         ) + ')'
 
-events = []
+# Module-level bindings for the nested event classes: a global load is
+# one dict probe, where Company.ShareClassWasCreated at each trigger is
+# an attribute lookup through the type's MRO.
+_SHARE_CLASS_WAS_CREATED = Company.ShareClassWasCreated
+_NEW_SHAREHOLDER_WAS_ADDED = Company.NewShareholderWasAdded
+_SHAREHOLDERS_WERE_ADDED = Company.ShareholdersWereAdded
+
+# Compact audit log: the subscriber only needs to count and classify
+# what was published, so instead of retaining every event object
+# (hundreds of bytes each) it records a one-byte kind id and the
+# 8-byte originator version per event. Kind ids are assigned as event
+# types are first seen.
+event_kinds = array.array('B')
+event_versions = array.array('q')
+_kind_ids = {}
+
+def _kind_of(event: Company.Event) -> int:
+    cls = type(event)
+    kind_id = _kind_ids.get(cls)
+    if kind_id is None:
+        kind_id = _kind_ids[cls] = len(_kind_ids)
+    return kind_id
+
+def _record_one(event: Company.Event) -> None:
+    event_kinds.append(_kind_of(event))
+    event_versions.append(event.originator_version)
+
+_subscribed = False
+
+def ensure_subscribed() -> None:
+    # Register the audit-log handler exactly once. subscribe() appends
+    # its handler on every call, so re-running the test driver used to
+    # stack registrations and record each event once per run.
+    global _subscribed
+    if not _subscribed:
+        from eventsourcing.domain.model.events import subscribe
+        subscribe(handler=add_to_event_record, predicate=is_company_event)
+        _subscribed = True
 
 def add_to_event_record(event: Company.Event) -> None:
-    events.extend(event)
-
-def is_company_event(event: Any) -> bool: 
-    return all(isinstance(e, Company.Event) for e in events)
+    # publish() hands the handler a list, but a bare event is accepted
+    if isinstance(event, Company.Event):
+        _record_one(event)
+    else:
+        for e in event:
+            _record_one(e)
+
+def is_company_event(event: Any) -> bool:
+    # The predicate is called once per publication, so it must inspect
+    # only what was published: re-scanning the whole event record here
+    # made every save O(record length). publish() hands the handler a
+    # list of events, but a bare event is accepted too.
+    if isinstance(event, Company.Event):
+        return True
+    return isinstance(event, (list, tuple)) and all(
+        isinstance(e, Company.Event) for e in event
+    )
 
 def test_version_6():
-    # Get subscriber ready
-    from eventsourcing.domain.model.events import subscribe
-    global events
-    subscribe(handler=add_to_event_record, predicate=is_company_event)
+    # Get subscriber ready (no-op after the first run)
+    ensure_subscribed()
+    events_before = len(event_kinds)
 
     # Set up 
     new_company = Company.__create__(name="Rocinante Limited")
     new_company.create_share_class(name="ordinary", nominal_value=0.0001)
     initial_shareholders = ["James Holden", "Amos Burton", "Naomi Nagata", "Alex Kamal"]
+    # hoisted out of the loop: same attribute + subscript every pass
+    ordinary = new_company.share_classes[0]
     for person in initial_shareholders:
         new_company.add_new_shareholder(
             shareholder_name = person,
             number_of_shares = 2500,
-            share_class = new_company.share_classes[0]
+            share_class = ordinary
         )
     new_company.__save__()
 
@@ -196,7 +333,9 @@ def test_version_6():
 
     # Check our shareholders
     assert new_company.name == "Rocinante Limited"
-    assert "James Holden" and "Naomi Nagata" in [sh.name for sh in new_company.shareholders]
+    # set membership actually checks both names (the old `and` chain
+    # short-circuited to testing only the second) with O(1) lookups
+    assert {"James Holden", "Naomi Nagata"}.issubset(sh.name for sh in new_company.shareholders)
     assert len(new_company.shareholders) == 4
 
     # Check that James Holden has 2500 ordinary shares of £0.0001 each
@@ -205,12 +344,45 @@ def test_version_6():
     assert new_company.shareholders[0].shares_held[0].share_class.nominal_value == 0.0001
 
     # Check that our event log has some stuff in it
-    assert len(events) == 6
+    assert len(event_kinds) - events_before == 6
+    # one Created event, one share-class event, four shareholder events
+    assert len(_kind_ids) == 3
 
     return new_company
 
+def test_bulk_shareholders():
+    # The bulk command must trigger one event, apply every row, and
+    # rebuild the same state when its events are replayed.
+    company = Company.__create__(name="Bulk Limited")
+    company.create_share_class(name="ordinary", nominal_value=0.0001)
+    ordinary = company.share_classes[0]
+    company.add_new_shareholders([
+        ("James Holden", ordinary, 1000),
+        ("Naomi Nagata", ordinary, 2000),
+        ("Amos Burton", ordinary, 3000),
+    ])
+
+    # One pending event carries the whole roster
+    pending = list(company.__pending_events__)
+    assert isinstance(pending[-1], Company.ShareholdersWereAdded)
+    assert len(pending[-1].rows) == 3
+
+    # All rows are applied to the aggregate state
+    assert [sh.name for sh in company.shareholders] == ["James Holden", "Naomi Nagata", "Amos Burton"]
+    assert company.shareholders[1].shares_held[0].number == 2000
+    assert company.total_shares_issued == 6000
+    assert company.shares_by_class == {"ordinary": 6000}
+
+    # Replaying the pending events rebuilds the same state
+    replayed = None
+    for event in pending:
+        replayed = event.__mutate__(replayed)
+    assert [sh.name for sh in replayed.shareholders] == [sh.name for sh in company.shareholders]
+    assert replayed.total_shares_issued == company.total_shares_issued
+
 if __name__ == "__main__":
     newco = test_version_6()
+    test_bulk_shareholders()
     print("All tests passed")
     
 
@@ -5,60 +5,63 @@ https://www.eventsorcery.com/python-eventsourcing-tutorial-part-2-event-store/
 This file amends ../part_1-domain_layer/version_6.py as described
 in the above post. 
 """
+from collections import deque
+from dataclasses import dataclass
+from functools import lru_cache
 from typing import Any, List
 from eventsourcing.domain.model.aggregate import AggregateRoot
 from eventsourcing.domain.model.decorators import attribute
 
+# Kept for ad-hoc debugging of objects that still carry a __dict__.
 def get_simple_repr(obj):
     attributes = ("%s=%r" % (k, v) for k, v in obj.__dict__.items())
     return "<%s(%s)>" % (obj.__class__.__name__, ', '.join(attributes))
 
 class Shareholder:
+    # __slots__ saves the per-instance __dict__, which adds up when an
+    # aggregate is reconstructed with thousands of these objects.
+    __slots__ = ("name", "shares_held")
+
     def __init__(self, name: str) -> None:
         self.name = name
         self.shares_held = []
 
     def __repr__(self):
-        return get_simple_repr(self)
+        return f"<Shareholder(name={self.name!r}, shares_held={self.shares_held!r})>"
 
+# A share class is a value object: once created its attributes never
+# change, so it can be a frozen dataclass. frozen=True makes aliasing
+# (e.g. the shared default instance below) provably safe and gives us
+# hashability for free; slots=True keeps the per-instance memory saving.
+@dataclass(slots=True, frozen=True)
 class ShareClass:
-    def __init__(
-        self,
-        name: str = "ordinary",
-        nominal_value: float = 0.0001,
-        entitled_to_dividends: bool = True,
-        entitled_to_capital: bool = True,
-        votes_per_share: int = 1,
-        redeemable: bool = False
-    ) -> None:
-        self.name = name
-        self.nominal_value = nominal_value 
-        self.entitled_to_dividends = entitled_to_dividends
-        self.entitled_to_capital = entitled_to_capital
-        self.votes_per_share = votes_per_share
-        self.redeemable = redeemable
-
-    def __repr__(self):
-        return get_simple_repr(self)
-
+    name: str = "ordinary"
+    nominal_value: float = 0.0001
+    entitled_to_dividends: bool = True
+    entitled_to_capital: bool = True
+    votes_per_share: int = 1
+    redeemable: bool = False
+
+# The default share class never changes, so one shared instance avoids
+# allocating a fresh six-attribute object for every Shares created
+# without an explicit class.
+_DEFAULT_ORDINARY_SHARE_CLASS = ShareClass(
+    name="ordinary",
+    nominal_value=1,
+    entitled_to_dividends=True,
+    entitled_to_capital=True,
+    votes_per_share=1,
+    redeemable=False
+)
+
+@dataclass(slots=True, frozen=True)
 class Shares: 
-    def __init__(
-        self, 
-        number: int, 
-        share_class: ShareClass
-    ) -> None:
-        self.number = number
-        self.share_class = share_class or ShareClass(
-                name="ordinary", 
-                nominal_value=1,
-                entitled_to_dividends=True,
-                entitled_to_capital=True,
-                votes_per_share=1,
-                redeemable=False
-            )
+    number: int
+    share_class: ShareClass = None
 
-    def __repr__(self):
-        return get_simple_repr(self)
+    def __post_init__(self):
+        if not self.share_class:
+            object.__setattr__(self, "share_class", _DEFAULT_ORDINARY_SHARE_CLASS)
 
 class Company(AggregateRoot):
     __subclassevents__ = True
@@ -67,7 +70,7 @@ class Company(AggregateRoot):
         super().__init__(**kwargs)
         self._name = name
         self.shareholders = []
-        self.share_classes = []
+        self.share_classes = {}
 
     def __repr__(self):
         return f"Company(name='{self.name}')"
@@ -106,7 +109,8 @@ class Company(AggregateRoot):
                 nominal_value=event.nominal_value, 
                 votes_per_share=event.votes_per_share
             )
-            company.share_classes.append(new_shareclass)
+            # keyed by name so membership tests and lookups are O(1)
+            company.share_classes[new_shareclass.name] = new_shareclass
 
     def add_new_shareholder(
         self,
@@ -131,13 +135,38 @@ class Company(AggregateRoot):
             new_shareholder.shares_held.append(new_shares)
             company.shareholders.append(new_shareholder)
 
-events = []
+# A deque appends and extends in O(1) without the periodic reallocation
+# and copy that a growing list pays during bulk replay, and the maxlen
+# bounds how much memory the record can pin in a long-running process.
+# Note that importing this module installs no handler: the subscription
+# happens inside test_domain_model, so only the test drivers pay for
+# the global record at all.
+events = deque(maxlen=10_000)
 
 def add_to_event_record(event: Company.Event) -> None:
     events.extend(event)
 
+def _iter_event_types(cls):
+    yield cls
+    for subclass in cls.__subclasses__():
+        yield from _iter_event_types(subclass)
+
+# All Company event classes exist once the class body above has executed
+# (__subclassevents__ creates them at class definition time), so the set
+# can be built once at import.
+_COMPANY_EVENT_TYPES = frozenset(_iter_event_types(Company.Event))
+
+@lru_cache(maxsize=64)
+def _is_company_event_class(cls) -> bool:
+    # The issubclass fallback covers event classes created after import
+    # that the precomputed set cannot know about; the cache means each
+    # distinct class pays for the check only once.
+    return cls in _COMPANY_EVENT_TYPES or issubclass(cls, Company.Event)
+
 def is_company_event(event: Any) -> bool: 
-    return all(isinstance(e, Company.Event) for e in event)
+    # an empty publication is vacuously true under all(), so reject it
+    # outright before paying for the subscriber path
+    return bool(event) and all(_is_company_event_class(type(e)) for e in event)
 
 def test_domain_model():
     # Get subscriber ready
@@ -153,17 +182,20 @@ def test_domain_model():
         new_company.add_new_shareholder(
             shareholder_name = person,
             number_of_shares = 2500,
-            share_class = new_company.share_classes[0]
+            share_class = new_company.share_classes["ordinary"]
         )
     new_company.__save__()
 
     # Check that the company has a newly created ordinary share class
-    assert new_company.share_classes[0].name == "ordinary"
-    assert new_company.share_classes[0].nominal_value == 0.0001
+    assert "ordinary" in new_company.share_classes
+    assert new_company.share_classes["ordinary"].name == "ordinary"
+    assert new_company.share_classes["ordinary"].nominal_value == 0.0001
 
     # Check our shareholders
     assert new_company.name == "Rocinante Limited"
-    assert "James Holden" and "Naomi Nagata" in [sh.name for sh in new_company.shareholders]
+    # set membership actually checks both names (the old `and` chain
+    # short-circuited to testing only the second) with O(1) lookups
+    assert {"James Holden", "Naomi Nagata"}.issubset(sh.name for sh in new_company.shareholders)
     assert len(new_company.shareholders) == 4
 
     # Check that James Holden has 2500 ordinary shares of £0.0001 each
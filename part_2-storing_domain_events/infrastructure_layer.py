@@ -3,28 +3,98 @@ This is part of the code accompanying this article:
 https://www.eventsorcery.com/python-eventsourcing-tutorial-part-2-event-store/ 
 """
 
+from sqlalchemy import event as sqlalchemy_event
 from eventsourcing.infrastructure.sqlalchemy.datastore import SQLAlchemySettings, SQLAlchemyDatastore
 from eventsourcing.infrastructure.sqlalchemy.records import StoredEventRecord
 from eventsourcing.infrastructure.sqlalchemy.manager import SQLAlchemyRecordManager
 from eventsourcing.infrastructure.sequenceditem import StoredEvent
 from eventsourcing.infrastructure.sequenceditemmapper import SequencedItemMapper
 from eventsourcing.infrastructure.eventstore import EventStore
+import os
+from eventsourcing.exceptions import DataIntegrityError
 from eventsourcing.utils.cipher.aes import AESCipher
 from eventsourcing.utils.random import encode_random_bytes, decode_bytes
 
+try:
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+except ImportError:
+    AESGCM = None
+
+class AesGcmCipher:
+    """
+    Drop-in replacement for the library's AESCipher that goes through
+    OpenSSL's AES-GCM (hardware AES-NI on most CPUs). Every stored event
+    is encrypted on the way in and decrypted on every replay, so the
+    cipher is on the hot path. The ciphertext layout (nonce + tag +
+    encrypted) matches AESCipher, so stored events stay compatible.
+    """
+
+    def __init__(self, cipher_key: bytes):
+        assert len(cipher_key) in [16, 24, 32]
+        self.aesgcm = AESGCM(cipher_key)
+
+    def encrypt(self, plaintext: bytes) -> bytes:
+        nonce = os.urandom(12)
+        encrypted_with_tag = self.aesgcm.encrypt(nonce, plaintext, None)
+        return nonce + encrypted_with_tag[-16:] + encrypted_with_tag[:-16]
+
+    def decrypt(self, ciphertext: bytes) -> bytes:
+        nonce = ciphertext[:12]
+        if len(nonce) != 12:
+            raise DataIntegrityError("Cipher text is damaged: invalid nonce length")
+        tag = ciphertext[12:28]
+        if len(tag) != 16:
+            raise DataIntegrityError("Cipher text is damaged: invalid tag length")
+        encrypted = ciphertext[28:]
+        try:
+            return self.aesgcm.decrypt(nonce, encrypted + tag, None)
+        except Exception as e:
+            raise DataIntegrityError("Cipher text is damaged: {}".format(e))
+
 cipher_key = encode_random_bytes(num_bytes=32)
-cipher = AESCipher(cipher_key=decode_bytes(cipher_key))
+if AESGCM is not None:
+    cipher = AesGcmCipher(cipher_key=decode_bytes(cipher_key))
+else:
+    cipher = AESCipher(cipher_key=decode_bytes(cipher_key))
+
+def set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    # WAL journalling with synchronous=NORMAL avoids a full fsync on every
+    # commit, which is the hot path when events are saved one aggregate at
+    # a time. WAL only takes effect on file-backed databases; on ":memory:"
+    # these pragmas are harmless no-ops.
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.close()
 
 def construct_sqlalchemy_db(uri="sqlite://") -> SQLAlchemyDatastore:
     db = SQLAlchemyDatastore(
-        settings=SQLAlchemySettings(uri), 
+        settings=SQLAlchemySettings(uri),
         tables=(StoredEventRecord,)
     )
     db.setup_connection()
+    engine = db.session.get_bind()
+    if engine.url.drivername.startswith("sqlite"):
+        # register on the engine so every pooled connection gets the pragmas
+        sqlalchemy_event.listen(engine, "connect", set_sqlite_pragmas)
     db.drop_tables()
     db.setup_tables()
     return db
 
+def record_new_events(event_store: EventStore, domain_events: list, batch_size: int = 500) -> None:
+    # Mapping a list of domain events through the event mapper and recording
+    # them with a single record_items() call means one database round-trip
+    # covers the whole batch, instead of one INSERT per event: the record
+    # manager compiles the insert once and executes it with a list of
+    # parameter dicts (executemany). Chunking keeps very large batches
+    # comfortably under SQLite's bind-variable limits.
+    for start in range(0, len(domain_events), batch_size):
+        batch = domain_events[start:start + batch_size]
+        stored_items = [event_store.event_mapper.item_from_event(e) for e in batch]
+        event_store.record_manager.record_items(stored_items)
+
 def create_event_store(db) -> EventStore:
     record_manager = SQLAlchemyRecordManager(
         session=db.session, 
@@ -44,6 +114,7 @@ def create_event_store(db) -> EventStore:
     return event_store
 
 if __name__ == "__main__":
+    from itertools import islice
     from domain_model import test_domain_model
     newco, events = test_domain_model()
     print("Domain model tests passed")
@@ -55,11 +126,12 @@ if __name__ == "__main__":
     # add the old global events to the event store
     event_store.store_events(events)
     
-    # manually add a new event to the event store
-    newco.add_new_shareholder(shareholder_name="Mars Investments", share_class=newco.share_classes[0], number_of_shares=1000)
+    # manually add a new event to the event store, batching however many
+    # new events have accumulated into a single insert
+    number_already_stored = len(events)
+    newco.add_new_shareholder(shareholder_name="Mars Investments", share_class=newco.share_classes["ordinary"], number_of_shares=1000)
     newco.__save__()
-    domain_event_as_stored_item = event_store.event_mapper.item_from_event(events[-1])
-    event_store.record_manager.record_item(domain_event_as_stored_item)
+    record_new_events(event_store, list(islice(events, number_already_stored, None)))
 
     # verify that our event store contains the newest event
     assert event_store.get_most_recent_event(newco.id).shareholder_name == "Mars Investments"
@@ -10,13 +10,59 @@ zarek@techlawyer.co.uk
 Licensed under GNU/GPL3.
 """
 
+from functools import lru_cache
 from typing import Any, List
 from uuid import UUID
 from decimal import Decimal
 from domain_model import Person, Company
 from eventsourcing.application.sqlalchemy import SQLAlchemyApplication
+from eventsourcing.application.snapshotting import SnapshottingApplication
+from eventsourcing.domain.model.events import publish
+from eventsourcing.infrastructure import sequenceditemmapper as _sequenceditemmapper
+from eventsourcing.utils import topic as _topic
+from eventsourcing.utils import transcoding as _transcoding
 
-class CompanyApp(SQLAlchemyApplication):
+# The library resolves every stored event's topic string back to its
+# class with importlib.import_module plus a getattr walk, once per
+# decoded event. The handful of distinct topics per application makes
+# this an ideal memo; the cache is installed into each module that
+# imported resolve_topic by name.
+if not hasattr(_topic.resolve_topic, "cache_info"):
+    _resolve_topic_cached = lru_cache(maxsize=None)(_topic.resolve_topic)
+    _topic.resolve_topic = _resolve_topic_cached
+    _transcoding.resolve_topic = _resolve_topic_cached
+    _sequenceditemmapper.resolve_topic = _resolve_topic_cached
+
+class CompanyApp(SnapshottingApplication, SQLAlchemyApplication):
+
+    # Take a snapshot every 50 events so that reconstituting a long-lived
+    # aggregate replays only the latest snapshot plus the events since it,
+    # instead of the whole history from the beginning. The period is
+    # global (the library keeps one snapshotting policy per application);
+    # 50 suits the issuance-heavy Company streams, and Person streams are
+    # short enough that the extra snapshots cost little.
+    snapshot_period = 50
+
+    def __init__(self, use_cache: bool = True, **kwargs: Any) -> None:
+        # Keep recently used aggregates in memory so repeated
+        # repository[aggregate_id] lookups skip the database read and
+        # event replay entirely. The repository evicts an entity from
+        # the cache if its records fail to write.
+        super().__init__(use_cache=use_cache, **kwargs)
+
+    def save_together(self, *aggregates) -> None:
+        # Publish the pending events of several aggregates as one batch,
+        # so the persistence policy stores them in a single transaction
+        # (one fsync) instead of one per aggregate. Event order within
+        # and across the aggregates is preserved. Order matters for
+        # snapshotting: the policy snapshots the originator of the
+        # batch's LAST event, so callers put the aggregate with the
+        # longest stream (the company) last.
+        batch = []
+        for aggregate in aggregates:
+            batch.extend(aggregate.__batch_pending_events__())
+        if batch:
+            publish(batch)
 
     def involve_person(
         self, 
@@ -55,13 +101,14 @@ class CompanyApp(SQLAlchemyApplication):
           restricted_articles=False
         )
         
+        directors = []
         for director_id in initial_directors_ids:
             assert isinstance(director_id, UUID), "director must be of type UUID"
             director = self.repository[director_id]
             appointment = company.add_officer(person=director, officer_type="director", appointment_date="20-02-2020")
             director.record_appointment(appointment)
-            director.__save__()
-        company.__save__()
+            directors.append(director)
+        self.save_together(*directors, company)
         return company.id
     
     def issue_ordinary_shares(
@@ -87,9 +134,8 @@ class CompanyApp(SQLAlchemyApplication):
             entitled_to_capital=True,
             redeemable=False
         )
-        company.__save__()
         person.record_shareholding(shareholding)
-        person.__save__()
+        self.save_together(person, company)
 
 if __name__ == "__main__":
     # For using the Python shell
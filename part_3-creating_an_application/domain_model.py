@@ -11,10 +11,14 @@ Licensed under GNU/GPL3.
 """
 
 from __future__ import annotations
+import sys
+from functools import cached_property
+from itertools import chain
 from typing import Any
 from datetime import datetime
 from decimal import Decimal
-from uuid import uuid4, UUID
+from uuid import uuid4, uuid5, UUID
+from dataclasses import dataclass
 from eventsourcing.domain.model.aggregate import AggregateRoot
 
 class Person(AggregateRoot):
@@ -72,11 +76,30 @@ class Person(AggregateRoot):
             assert isinstance(former_names, list)
         self._former_names = former_names or []
         self._shareholdings = []
+        # Shareholding ids already recorded, so the duplicate check in
+        # record_shareholding is one set lookup instead of a list scan.
+        self._shareholding_ids = set()
+        # Holdings grouped by company name, maintained by
+        # ShareholdingRecorded.mutate, so get_shareholdings(company) is
+        # a dict lookup rather than a filter over every holding.
+        self._shareholdings_by_company = {}
         self._appointments = []
+        # (company id, officer type) pairs already recorded, so the
+        # duplicate check in record_appointment is a set lookup.
+        self._appointment_keys = set()
 
     def __repr__(self) -> str:
         return f"<Person(name='{self.name}')>"
 
+    # Two Person aggregates are the same person exactly when their ids
+    # match, so equality can be a single UUID comparison rather than the
+    # default entity comparison over the whole __dict__.
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, Person) and self.id == other.id
+
+    def __hash__(self) -> int:
+        return hash(self.id)
+
     @property
     def name(self) -> str:
         return self._name
@@ -98,25 +121,33 @@ class Person(AggregateRoot):
         return self._shareholdings
     
     def get_shareholdings(self, company: Company) -> List:
-        return [holding for holding in self.shareholdings if holding.company_name == company.name]
+        return self._shareholdings_by_company.get(company.name, [])
     
     def record_shareholding(self, shareholding: Shareholding) -> None:
         assert isinstance(shareholding, Shareholding)
-        if shareholding not in self._shareholdings:
+        if shareholding.id not in self._shareholding_ids:
             self.__trigger_event__(Person.ShareholdingRecorded, shareholding=shareholding)
     
     class ShareholdingRecorded(Event):
         def mutate(event, person):
-            person._shareholdings.append(event.shareholding)
+            shareholding = event.shareholding
+            person._shareholdings.append(shareholding)
+            person._shareholding_ids.add(shareholding.id)
+            person._shareholdings_by_company.setdefault(
+                shareholding.company_name, []
+            ).append(shareholding)
 
     def record_appointment(self, appointment: Officer) -> None:
         assert isinstance(appointment, Officer)
-        if appointment not in self._appointments:
+        if (appointment.company_id, appointment.officer_type) not in self._appointment_keys:
             self.__trigger_event__(Person.AppointmentRecorded, appointment=appointment)
     
     class AppointmentRecorded(Event):
         def mutate(event, person):
             person._appointments.append(event.appointment)
+            person._appointment_keys.add(
+                (event.appointment.company_id, event.appointment.officer_type)
+            )
 
 class Company(AggregateRoot):
     # A company is recognised as a legal entity under law. This model focuses
@@ -184,7 +215,22 @@ class Company(AggregateRoot):
         self._custom_articles = custom_articles
         self._restricted_articles = restricted_articles
         self._officers = []
+        # Officer indexes keyed by type and by person id, maintained by
+        # OfficerAdded.mutate, so lookups by either key avoid scanning
+        # the full officer list. The person index uses the UUID's hex
+        # string: this state ends up in snapshots, and the transcoder
+        # requires string dict keys.
+        self._officers_by_type = {}
+        self._officers_by_person = {}
         self._incorporated = False
+        # Index of shareholdings keyed by shareholder id (as its hex
+        # string — snapshot state must have string dict keys), maintained
+        # by SharesIssued.mutate, so finding a person's holdings is O(1)
+        # rather than a scan over every share class.
+        self._shareholdings_by_person = {}
+        # Issuance sequence number, advanced as each allotment is
+        # applied, from which shareholding ids are derived.
+        self._shareholding_seq = 0
     
     def __repr__(self) -> str:
         return f"<Company(name='{self.name}', registered_office='{self.registered_office}', total_shareholdings={self.total_shareholdings}>"
@@ -232,12 +278,15 @@ class Company(AggregateRoot):
         appointment_date: str, 
         occupation: str = None
     ) -> None:
-        assert isinstance(person, Person)
-        assert isinstance(officer_type, str)
-        assert isinstance(appointment_date, str)
-        if occupation:
-            assert isinstance(occupation, str)
-        assert person not in self.get_officers(officer_type=officer_type), f"{person.name} is already appointed as {officer_type}"
+        # Parameter validation lives in Officer.__init__, the single
+        # construction boundary; only the duplicate-appointment rule
+        # needs company state and stays here.
+        # the by-type index narrows the membership test to officers of
+        # the same type; any() exits on the first match
+        assert not any(
+            officer.person_id == person.id
+            for officer in self._officers_by_type.get(officer_type, [])
+        ), f"{person.name} is already appointed as {officer_type}"
         officer = Officer(
             company=self,
             person=person,
@@ -250,64 +299,59 @@ class Company(AggregateRoot):
         return officer
 
     def get_officers(self, officer_type: str = None):
-        if officer_type: 
-            return [officer for officer in self._officers if officer.officer_type == officer_type]
+        if officer_type:
+            return self._officers_by_type.get(officer_type, [])
         return self._officers
 
     def get_appointments(self, person: Person):
-        return [officer for officer in self._officers if officer.person_id == person.id]
+        return self._officers_by_person.get(person.id.hex, [])
 
     class OfficerAdded(Event):
         def mutate(event, company):
-            company._officers.append(event.officer)
+            officer = event.officer
+            company._officers.append(officer)
+            company._officers_by_type.setdefault(officer.officer_type, []).append(officer)
+            company._officers_by_person.setdefault(officer.person_id.hex, []).append(officer)
 
     @property
     def directors(self) -> List:
-        return [officer for officer in self._officers if officer.officer_type == "director"]
+        return self._officers_by_type.get("director", [])
 
     @property
     def has_sole_director(self) -> bool:
-        if len(self.directors) == 1:
-            return True
-        else:
-            return False
+        return len(self._officers_by_type.get("director", ())) == 1
 
-    @property 
+    @property
     def secretary(self) -> bool:
-        sec = [officer for officer in self._officers if officer.officer_type == "secretary"]
-        if sec:
-            return sec[0]
-        return None
+        # next() over the indexed bucket: no intermediate list, and
+        # None when no secretary has been appointed
+        return next(iter(self._officers_by_type.get("secretary", ())), None)
 
     @property
     def share_classes(self) -> str:
         return self._share_classes 
 
-    @property
+    # cached_property memoises these views in the instance __dict__;
+    # SharesIssued.mutate pops the cached values, so between events the
+    # full-register walk happens at most once however often the views
+    # are read.
+    @cached_property
     def shareholdings(self) -> list:
         return self.get_shareholdings()
 
-    @property
+    @cached_property
     def total_shareholdings(self) -> int:
-        return len(self.get_shareholdings())
+        return len(self.shareholdings)
 
     @property
     def statement(self) -> dict:
-        results = {}
-        for share_class_name, share_class in self._share_classes.items():
-            results[share_class_name] = {
-                "currency": share_class.currency,
-                "total_shares_issued": share_class.total_number_of_shares,
-                "nominal_value_per_share": share_class.nominal_value_per_share,
-                "aggregate_nominal_value": share_class.nominal_value_per_share * share_class.total_number_of_shares,
-                "total_price_paid": share_class.total_price_paid,
-                "aggregate_amount_unpaid": share_class.aggregate_amount_unpaid,
-                "votes_per_share": share_class.votes_per_share,
-                "entitled_to_dividends": share_class.entitled_to_dividends,
-                "entitled_to_capital": share_class.entitled_to_capital,
-                "redeemable": share_class.redeemable
-            }
-        return results
+        # Each row is cached on its share class and only rebuilt after
+        # an allotment changes that class, so reads between events patch
+        # together existing rows instead of recomputing anything.
+        return {
+            share_class_name: share_class.statement_row()
+            for share_class_name, share_class in self._share_classes.items()
+        }
 
     def issue_shares(
         self, 
@@ -320,24 +364,24 @@ class Company(AggregateRoot):
         entitled_to_dividends: bool,
         entitled_to_capital: bool,
         redeemable: bool,
-        allotted_on: datetime = datetime.now(),
-        issued_on: datetime = datetime.now(), 
+        allotted_on: datetime = None,
+        issued_on: datetime = None,
         currency: str = "GBP",
     ) -> None:
 
         # In practice, shares are first allotted within a share class before being
         # issued to a person. In most cases, from the perspective of the company,
-        # the act of allotment and issue happens together. 
-
-        assert isinstance(person, Person)
-        assert isinstance(number_of_shares, int)
-        assert isinstance(share_class_name, str)
-        assert isinstance(nominal_value_per_share, Decimal)
-        assert isinstance(price_paid_per_share, Decimal)
-        assert isinstance(votes_per_share, int)
-        assert isinstance(entitled_to_dividends, bool)
-        assert isinstance(entitled_to_capital, bool)
-        assert isinstance(redeemable, bool)
+        # the act of allotment and issue happens together. All parameter
+        # validation happens once, inside IssueSharesCommand.
+
+        # datetime.now() as a default argument would be evaluated once at
+        # import time and stamp every issuance with the module load time;
+        # resolve the timestamps here so each call gets the current time,
+        # and allotment and issue share a single clock read.
+        if allotted_on is None or issued_on is None:
+            now = datetime.now()
+            allotted_on = allotted_on if allotted_on is not None else now
+            issued_on = issued_on if issued_on is not None else now
 
         # A shareholding captures the idea of a person holding a certain number of
         # shares of a certain share class. The share class will have certain
@@ -349,77 +393,223 @@ class Company(AggregateRoot):
         # share class is changed to £0.001. In practice it is unlikely that
         # share certificates would be reissued to a shareholder upon such a change
         # being made, so in order to reflect that immutability we can consider
-        # easch 'Shareholding' a value object for the purposes of our model. 
-        shareholding = Shareholding(
-            company=self,
-            shareholder=person,
+        # easch 'Shareholding' a value object for the purposes of our model.
+
+        # The command object validates the whole parameter set once in
+        # its __post_init__ and travels as a single event attribute, so
+        # the event payload is one value object instead of ten loose
+        # kwargs. It carries only scalars; the Shareholding itself is
+        # reconstructed inside SharesIssued.mutate.
+        cmd = IssueSharesCommand(
+            shareholder_id=person.id,
+            shareholder_name=person.name,
+            shareholder_address=person.address,
             number_of_shares=number_of_shares,
             share_class_name=share_class_name,
-            nominal_value_per_share=Decimal(nominal_value_per_share),
-            price_paid_per_share=Decimal(price_paid_per_share),
-            allotted_on=allotted_on,
-            issued_on=issued_on
-        )
-        self.__trigger_event__(
-            Company.SharesIssued, 
-            shareholding=shareholding,
-            share_class_name=share_class_name,
             nominal_value_per_share=nominal_value_per_share,
+            price_paid_per_share=price_paid_per_share,
+            allotted_on=allotted_on,
+            issued_on=issued_on,
             votes_per_share=votes_per_share,
             entitled_to_dividends=entitled_to_dividends,
             entitled_to_capital=entitled_to_capital,
-            redeemable=redeemable,            
+            redeemable=redeemable,
             currency=currency
         )
-        return shareholding
+        self._establish_share_class_if_new(cmd)
+        self.__trigger_event__(Company.SharesIssued, cmd=cmd)
+        # __trigger_event__ applies the event immediately, so the new
+        # shareholding is the last one indexed for this person.
+        return self._shareholdings_by_person[person.id.hex][-1]
+
+
+    def _establish_share_class_if_new(self, cmd: IssueSharesCommand) -> None:
+        # First issuance into a class records the class itself as its
+        # own event, so SharesIssued application never needs a
+        # create-on-miss branch and replays of later issuances find the
+        # class already in place.
+        if cmd.share_class_name not in self._share_classes:
+            self.__trigger_event__(
+                Company.ShareClassEstablished,
+                spec=ShareClassSpec(
+                    name=cmd.share_class_name,
+                    nominal_value_per_share=cmd.nominal_value_per_share,
+                    votes_per_share=cmd.votes_per_share,
+                    entitled_to_dividends=cmd.entitled_to_dividends,
+                    entitled_to_capital=cmd.entitled_to_capital,
+                    redeemable=cmd.redeemable,
+                    currency=cmd.currency
+                )
+            )
+
+    class ShareClassEstablished(Event):
+        def mutate(event, company):
+            spec = event.spec
+            name = sys.intern(spec.name)
+            company._share_classes[name] = ShareClass(
+                name=name,
+                votes_per_share=spec.votes_per_share,
+                entitled_to_dividends=spec.entitled_to_dividends,
+                entitled_to_capital=spec.entitled_to_capital,
+                redeemable=spec.redeemable,
+                nominal_value_per_share=spec.nominal_value_per_share,
+                currency=spec.currency
+            )
 
+    def _apply_allotment(self, cmd: IssueSharesCommand) -> None:
+        # Shared by SharesIssued.mutate and SharesBulkIssued.mutate. The
+        # share class was established by its own event, so this is a
+        # straight dict hit with no create-on-miss fallback. Interned
+        # names make the lookup a pointer comparison.
+        #
+        # The shareholding id is derived from the company id and the
+        # issuance sequence with uuid5 (a hash, no urandom read), so
+        # replaying the same events always reproduces the same ids and
+        # the events need not carry them.
+        self._shareholding_seq += 1
+        shareholding_id = uuid5(
+            _SHAREHOLDING_NAMESPACE, f"{self.id}|{self._shareholding_seq}"
+        )
+        share_class_name = sys.intern(cmd.share_class_name)
+        share_class = self._share_classes[share_class_name]
+        shareholding = Shareholding(
+            shareholding_id=shareholding_id,
+            company_id=self.id,
+            company_name=self.name,
+            shareholder_id=cmd.shareholder_id,
+            shareholder_name=cmd.shareholder_name,
+            shareholder_address=cmd.shareholder_address,
+            share_class_name=share_class_name,
+            number_of_shares=cmd.number_of_shares,
+            nominal_value_per_share=cmd.nominal_value_per_share,
+            price_paid_per_share=cmd.price_paid_per_share,
+            allotted_on=cmd.allotted_on,
+            issued_on=cmd.issued_on,
+            currency=cmd.currency
+        )
+        share_class.add_allotment(shareholding)
+        self._shareholdings_by_person.setdefault(
+            shareholding.shareholder_id.hex, []
+        ).append(shareholding)
+        # drop the memoised register views; they are rebuilt lazily
+        self.__dict__.pop("shareholdings", None)
+        self.__dict__.pop("total_shareholdings", None)
 
     class SharesIssued(Event):
         def mutate(event, company):
-            try:
-                share_class = company._share_classes[event.share_class_name]
-            except KeyError:
-                share_class = ShareClass(
-                    name=event.share_class_name,
-                    votes_per_share=event.votes_per_share,
-                    entitled_to_dividends=event.entitled_to_dividends,
-                    entitled_to_capital=event.entitled_to_capital,
-                    redeemable=event.redeemable,                    
-                    nominal_value_per_share=event.nominal_value_per_share,
-                    currency=event.currency
-                )
-                company._share_classes[event.shareholding.share_class_name] = share_class
-            assert isinstance(share_class, ShareClass)
-            share_class.add_allotment(event.shareholding)
+            company._apply_allotment(event.cmd)
+
+    def issue_shares_bulk(self, allotments: list) -> None:
+        # One event for N allotments: bulk company setup pays the
+        # serialise-and-store cost once instead of once per holding.
+        # Each command validates itself on construction, so a bad
+        # allotment fails here before any event is triggered.
+        assert allotments, "allotments must be a non-empty list"
+        assert all(isinstance(cmd, IssueSharesCommand) for cmd in allotments)
+        for cmd in allotments:
+            self._establish_share_class_if_new(cmd)
+        self.__trigger_event__(
+            Company.SharesBulkIssued,
+            allotments=tuple(allotments)
+        )
+
+    class SharesBulkIssued(Event):
+        def mutate(event, company):
+            for cmd in event.allotments:
+                company._apply_allotment(cmd)
 
     # Once shares have been allotted, we need to be able to locate them. 
     def get_share_class(self, share_class_name) -> ShareClass:
-        return self._share_classes.get(share_class_name)
+        return self._share_classes.get(sys.intern(share_class_name))
 
     def get_shareholdings(self, person = None, share_class_name = None) -> List:
         if share_class_name:
             share_class = self.get_share_class(share_class_name)
             assert isinstance(share_class, ShareClass)
             if person:
-                return [holding for holding in share_class.shareholdings if holding.shareholder_id == person.id]
+                # filter the person's own (usually short) holdings list
+                # rather than scanning every holding in the share class
+                return [
+                    holding
+                    for holding in self._shareholdings_by_person.get(person.id.hex, ())
+                    if holding.share_class_name == share_class_name
+                ]
             return share_class.shareholdings
         elif person and not share_class_name:
-            persons_shareholdings = []
-            for share_class_name in self._share_classes:
-                for holding in self.share_classes[share_class_name].shareholdings:
-                    if holding.shareholder_id == person.id:
-                        persons_shareholdings.append(holding)
-            return persons_shareholdings
+            return list(self._shareholdings_by_person.get(person.id.hex, []))
         else: 
-            all_shareholdings = []
-            for share_class_name in self.share_classes:
-                for holding in self.share_classes[share_class_name].shareholdings:
-                    all_shareholdings.append(holding)
-            return all_shareholdings
+            return list(self.iter_shareholdings())
+
+    def iter_shareholdings(self):
+        # Lazily chains the per-class lists, so callers that only count
+        # or stop at the first match never build the combined list.
+        return chain.from_iterable(
+            share_class.shareholdings for share_class in self._share_classes.values()
+        )
+
+# Namespace for deriving shareholding ids deterministically from the
+# company id and issuance sequence.
+_SHAREHOLDING_NAMESPACE = UUID("d260d512-c9f4-47b8-8234-fea6599f26da")
+
+
+# The defining attributes of a share class, recorded once per class by
+# the ShareClassEstablished event instead of repeated on every
+# issuance into it.
+@dataclass(frozen=True, slots=True)
+class ShareClassSpec:
+    name: str
+    nominal_value_per_share: Decimal
+    votes_per_share: int
+    entitled_to_dividends: bool
+    entitled_to_capital: bool
+    redeemable: bool
+    currency: str = "GBP"
+
+
+# The full parameter set of a share issue, validated once at
+# construction instead of through a wall of per-call asserts in
+# issue_shares. Frozen with slots so instances are cheap and safely
+# shareable between the event payload and the aggregate state.
+@dataclass(frozen=True, slots=True)
+class IssueSharesCommand:
+    shareholder_id: UUID
+    shareholder_name: str
+    shareholder_address: str
+    number_of_shares: int
+    share_class_name: str
+    nominal_value_per_share: Decimal
+    price_paid_per_share: Decimal
+    votes_per_share: int
+    entitled_to_dividends: bool
+    entitled_to_capital: bool
+    redeemable: bool
+    allotted_on: datetime
+    issued_on: datetime
+    currency: str = "GBP"
+
+    def __post_init__(self):
+        assert isinstance(self.number_of_shares, int)
+        assert isinstance(self.share_class_name, str)
+        assert isinstance(self.nominal_value_per_share, Decimal)
+        assert isinstance(self.price_paid_per_share, Decimal)
+        assert isinstance(self.votes_per_share, int)
+        assert isinstance(self.entitled_to_dividends, bool)
+        assert isinstance(self.entitled_to_capital, bool)
+        assert isinstance(self.redeemable, bool)
+
 
 # An Officer is a person who has been appointed as either
 # a director or a secretary of the company. 
 class Officer(object):
+    # __slots__ keeps per-officer memory to a fixed set of attribute
+    # cells instead of a per-instance dict; the event transcoder
+    # serializes slotted objects the same way it does dict-based ones.
+    __slots__ = (
+        "company_id", "company_name", "person_id", "person_name",
+        "person_address", "officer_type", "appointment_date",
+        "occupation", "service_address", "former_names",
+    )
+
     def __init__(
         self,
         company: Company,
@@ -431,12 +621,19 @@ class Officer(object):
         former_names: list = None
     ): 
         assert officer_type in ["director", "secretary"], f"officer type must be either 'director' or 'secretary'"
+        assert isinstance(person, Person)
+        assert isinstance(appointment_date, str)
+        if occupation:
+            assert isinstance(occupation, str)
         self.company_id = company.id
-        self.company_name = company.name
+        # Interned copies of the strings repeated across officers, so
+        # each company name and officer type is stored once and compares
+        # by pointer in the index lookups.
+        self.company_name = sys.intern(company.name)
         self.person_id = person.id
         self.person_name = person.name
         self.person_address = person.address
-        self.officer_type = officer_type
+        self.officer_type = sys.intern(officer_type)
         self.appointment_date = appointment_date
         self.occupation = occupation
         self.service_address = service_address
@@ -459,6 +656,15 @@ class Officer(object):
 # can have any number of share classes, so long as the name is unique. 
 
 class ShareClass(object):
+    __slots__ = (
+        "_name", "_shareholdings", "_nominal_value_per_share",
+        "_votes_per_share", "_entitled_to_dividends",
+        "_entitled_to_capital", "_redeemable", "_currency",
+        "_total_number_of_shares", "_aggregate_nominal_value",
+        "_total_price_paid", "_aggregate_amount_unpaid",
+        "_statement_row",
+    )
+
     def __init__(
         self, name: str, 
         nominal_value_per_share: Decimal,
@@ -476,6 +682,14 @@ class ShareClass(object):
         self._entitled_to_capital = entitled_to_capital
         self._redeemable = redeemable                    
         self._currency = currency
+        # Running totals, maintained by add_allotment as each holding is
+        # applied, so the aggregate properties are O(1) lookups instead
+        # of traversals of the shareholdings list.
+        self._total_number_of_shares = 0
+        self._aggregate_nominal_value = Decimal("0.00")
+        self._total_price_paid = Decimal("0.00")
+        self._aggregate_amount_unpaid = Decimal("0.00")
+        self._statement_row = None
 
     def __repr__(self):
         return f"<ShareClass(name='{self.name}', nominal_value={self.nominal_value}, total_shareholdings={self.total_shareholdings}>"
@@ -518,34 +732,45 @@ class ShareClass(object):
 
     @property
     def total_number_of_shares(self):
-        total = 0
-        for shareholding in self._shareholdings:
-            total += shareholding.number_of_shares
-        return total
+        return self._total_number_of_shares
 
     @property
     def aggregate_nominal_value(self):
-        total = Decimal("0.00")
-        for shareholding in self._shareholdings:
-            total += Decimal(shareholding.nominal_value_per_share)
-        return total
+        return self._aggregate_nominal_value
 
     @property
     def total_price_paid(self):
-        total = Decimal("0.00")
-        for shareholding in self._shareholdings:
-            total += Decimal(shareholding.price_paid_per_share) * Decimal(shareholding.number_of_shares)
-        return total
+        return self._total_price_paid
 
     @property
     def aggregate_amount_unpaid(self):
-        total = Decimal("0.00")
-        for shareholding in self._shareholdings:
-            total += Decimal(shareholding.unpaid_per_share) * Decimal(shareholding.number_of_shares)
-        return total
+        return self._aggregate_amount_unpaid
+
+    def statement_row(self) -> dict:
+        if self._statement_row is None:
+            self._statement_row = {
+                "currency": self._currency,
+                "total_shares_issued": self._total_number_of_shares,
+                "nominal_value_per_share": self._nominal_value_per_share,
+                "aggregate_nominal_value": self._nominal_value_per_share * self._total_number_of_shares,
+                "total_price_paid": self._total_price_paid,
+                "aggregate_amount_unpaid": self._aggregate_amount_unpaid,
+                "votes_per_share": self._votes_per_share,
+                "entitled_to_dividends": self._entitled_to_dividends,
+                "entitled_to_capital": self._entitled_to_capital,
+                "redeemable": self._redeemable
+            }
+        return self._statement_row
 
     def add_allotment(self, allotment):
+        # the cached statement row is stale as soon as the totals move
+        self._statement_row = None
         self._shareholdings.append(allotment)
+        number = allotment.number_of_shares
+        self._total_number_of_shares += number
+        self._aggregate_nominal_value += allotment._nominal_value
+        self._total_price_paid += allotment._price_paid * number
+        self._aggregate_amount_unpaid += allotment._unpaid * number
     
 
 # A shareholding refers to shares held by a person in the capital of 
@@ -558,10 +783,27 @@ class ShareClass(object):
 # provides the minimum information that should be shown on a physical certificate.
 
 class Shareholding(object):
+    __slots__ = (
+        "id", "company_name", "company_id", "shareholder_name",
+        "shareholder_address", "shareholder_id", "share_class_name",
+        "number_of_shares", "price_paid_per_share",
+        "nominal_value_per_share", "issued_on", "allotted_on",
+        "unpaid_per_share", "currency",
+        "_price_paid", "_nominal_value", "_unpaid",
+        "_certificate",
+    )
+
+    # Built from the scalar fields of a SharesIssued event rather than
+    # from live Person/Company objects, so reconstructing it during event
+    # replay never touches another aggregate.
     def __init__(
         self, 
-        shareholder: Person,
-        company: Company,
+        shareholding_id: UUID,
+        company_id: UUID,
+        company_name: str,
+        shareholder_id: UUID,
+        shareholder_name: str,
+        shareholder_address: str,
         share_class_name: str,
         number_of_shares: int, 
         price_paid_per_share: Decimal,
@@ -571,41 +813,52 @@ class Shareholding(object):
         unpaid_per_share: Decimal = 0,
         currency: str = "GBP",
     ) -> Shareholding: 
-        self.id = uuid4()
-        self.company_name = company.name
-        self.company_id = company.id
-        self.shareholder_name = shareholder.name
-        self.shareholder_address = shareholder.address
-        self.shareholder_id = shareholder.id
-        self.share_class_name = share_class_name
+        self.id = shareholding_id
+        # company_name, share_class_name and currency repeat across
+        # every holding in a company; interning keeps one copy of each
+        # and makes the equality checks in the lookup paths pointer
+        # comparisons.
+        self.company_name = sys.intern(company_name)
+        self.company_id = company_id
+        self.shareholder_name = shareholder_name
+        self.shareholder_address = shareholder_address
+        self.shareholder_id = shareholder_id
+        self.share_class_name = sys.intern(share_class_name)
         self.number_of_shares = number_of_shares
         self.price_paid_per_share = str(price_paid_per_share)
         self.nominal_value_per_share = str(nominal_value_per_share)
         self.issued_on = issued_on
         self.allotted_on = allotted_on
         self.unpaid_per_share = unpaid_per_share
-        self.currency = currency
+        self.currency = sys.intern(currency)
+        # Decimals for arithmetic, kept as passed in (the command has
+        # already validated the types, and Decimal is immutable, so
+        # re-wrapping in Decimal(...) would just allocate a copy); the
+        # aggregation in add_allotment and share_premium never parses
+        # the display strings above back into Decimals.
+        self._price_paid = price_paid_per_share
+        self._nominal_value = nominal_value_per_share
+        self._unpaid = Decimal(unpaid_per_share)
+        # memo slot for the certificate text (a value object never
+        # changes, so the text is formatted at most once)
+        self._certificate = None
 
     def __repr__(self):
         return f"<Shareholding(shareholder='{self.shareholder_name}', company_name='{self.company_name}', number_of_shares={self.number_of_shares}>"
 
     @property
     def certificate(self):
-        return "Share certificate: {name} of {address} holds {no_shares} {share_class} shares of {curr} £{nom_val} each in the capital of {co_name}".format(
-            name=self.shareholder_name,
-            address=self.shareholder_address,
-            no_shares=self.number_of_shares,
-            share_class=self.share_class_name,
-            curr=self.currency,
-            nom_val=self.nominal_value_per_share,
-            co_name=self.company_name
-        )
+        if self._certificate is None:
+            self._certificate = (
+                f"Share certificate: {self.shareholder_name} of {self.shareholder_address} "
+                f"holds {self.number_of_shares} {self.share_class_name} shares of "
+                f"{self.currency} £{self.nominal_value_per_share} each in the capital of {self.company_name}"
+            )
+        return self._certificate
 
     @property
     def share_premium(self) -> Decimal:
-        paid = Decimal(self.price_paid_per_share)
-        nom_val = Decimal(self.nominal_value_per_share)
-        return paid - nom_val
+        return self._price_paid - self._nominal_value
     
 if __name__ == "__main__":
     company = Company.prepare_new(
@@ -13,8 +13,10 @@ Licensed under GNU/GPL3.
 import unittest
 from uuid import UUID
 from decimal import Decimal
-from domain_model import Person, Company
+from datetime import datetime
+from domain_model import Person, Company, IssueSharesCommand
 from eventsourcing.application.sqlalchemy import SQLAlchemyApplication
+from eventsourcing.infrastructure.snapshotting import entity_from_snapshot
 from eventsourcing.utils.random import encoded_random_bytes
 from app import CompanyApp
 
@@ -112,12 +114,90 @@ class TestCompanyApp(unittest.TestCase):
         # share certificate to the shareholder which is proof that they hold the shares.
 
         jim = self.app.repository[self.jim_id]
-        company = self.app.repository[self.company_id]
         jim_shares_company_record = company.get_shareholdings(person=jim)
         self.assertEqual(len(jim_shares_company_record), 1)
         jim_shares_person_record = jim.get_shareholdings(company=company)
         self.assertEqual(len(jim_shares_person_record), 1)
 
+    def test_bulk_issued_shares_survive_replay(self):
+        company = self.app.repository[self.company_id]
+        amos = self.app.repository[self.amos_id]
+        now = datetime.now()
+        company.issue_shares_bulk([
+            IssueSharesCommand(
+                shareholder_id=amos.id,
+                shareholder_name=amos.name,
+                shareholder_address=amos.address,
+                number_of_shares=number_of_shares,
+                share_class_name="ordinary",
+                nominal_value_per_share=Decimal("0.0001"),
+                price_paid_per_share=Decimal("0.0001"),
+                votes_per_share=1,
+                entitled_to_dividends=True,
+                entitled_to_capital=True,
+                redeemable=False,
+                allotted_on=now,
+                issued_on=now
+            )
+            for number_of_shares in (1000, 1500)
+        ])
+        company.__save__()
+
+        # get_entity bypasses the repository cache and replays the
+        # stored events, so this exercises the SharesBulkIssued record
+        replayed = self.app.repository.get_entity(self.company_id)
+        self.assertEqual(replayed.total_shareholdings, 2)
+        self.assertEqual(replayed.statement["ordinary"]["total_shares_issued"], 2500)
+        self.assertEqual(len(replayed.get_shareholdings(person=amos)), 2)
+
+    def test_company_snapshot_taken_past_snapshot_period(self):
+        # The snapshotting policy snapshots the originator of the last
+        # event in each published batch, and the app orders its batches
+        # company-last, so driving the company past snapshot_period
+        # must leave a Company snapshot behind.
+        person_ids = [self.jim_id, self.naomi_id, self.amos_id, self.alex_id]
+        for i in range(CompanyApp.snapshot_period):
+            self.app.issue_ordinary_shares(
+                in_company_id=self.company_id,
+                to_person_id=person_ids[i % len(person_ids)],
+                number_of_shares=100,
+                nominal_value_per_share=Decimal("0.0001"),
+                price_paid_per_share=Decimal("0.0001")
+            )
+        snapshot = self.app.snapshot_strategy.get_snapshot(self.company_id)
+        self.assertIsNotNone(snapshot)
+        company = entity_from_snapshot(snapshot)
+        self.assertIsInstance(company, Company)
+        self.assertEqual(company.name, "Rocinante Limited")
+
+    def test_aggregate_snapshots_serialize_and_restore(self):
+        # Snapshot state passes through the JSON transcoder, which only
+        # accepts string dict keys — this guards the aggregates' derived
+        # indexes against reintroducing unserializable keys.
+        self.app.issue_ordinary_shares(
+            in_company_id=self.company_id,
+            to_person_id=self.jim_id,
+            number_of_shares=2500,
+            nominal_value_per_share=Decimal("0.0001"),
+            price_paid_per_share=Decimal("0.0001")
+        )
+        self.app.repository.take_snapshot(self.company_id)
+        self.app.repository.take_snapshot(self.jim_id)
+
+        company_snapshot = self.app.snapshot_strategy.get_snapshot(self.company_id)
+        self.assertIsNotNone(company_snapshot)
+        company = entity_from_snapshot(company_snapshot)
+        self.assertEqual(company.name, "Rocinante Limited")
+        self.assertEqual(len(company.directors), 2)
+        self.assertEqual(company.total_shareholdings, 1)
+
+        person_snapshot = self.app.snapshot_strategy.get_snapshot(self.jim_id)
+        self.assertIsNotNone(person_snapshot)
+        jim = entity_from_snapshot(person_snapshot)
+        self.assertEqual(jim.name, "James Holden")
+        self.assertEqual(len(jim.get_shareholdings(company=company)), 1)
+        self.assertEqual(len(company.get_appointments(jim)), 1)
+
 
 if __name__ == "__main__":
     unittest.main(exit=False)
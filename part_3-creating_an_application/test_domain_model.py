@@ -13,7 +13,7 @@ Licensed under GNU/GPL3.
 import unittest
 from datetime import datetime
 from decimal import Decimal
-from domain_model import Person, Company, Officer, Shareholding, ShareClass
+from domain_model import Person, Company, Officer, Shareholding, ShareClass, IssueSharesCommand
 
 class TestCompany(unittest.TestCase):
 
@@ -165,6 +165,40 @@ class TestCompany(unittest.TestCase):
         self.assertTrue(ordinary.entitled_to_capital)
         self.assertFalse(ordinary.redeemable)
 
+    def test_shares_can_be_issued_in_bulk(self):
+        now = datetime.now()
+        allotments = [
+            IssueSharesCommand(
+                shareholder_id=self.tonald.id,
+                shareholder_name=self.tonald.name,
+                shareholder_address=self.tonald.address,
+                number_of_shares=number_of_shares,
+                share_class_name="ordinary",
+                nominal_value_per_share=Decimal("0.01"),
+                price_paid_per_share=Decimal("0.01"),
+                votes_per_share=1,
+                entitled_to_dividends=True,
+                entitled_to_capital=True,
+                redeemable=False,
+                allotted_on=now,
+                issued_on=now
+            )
+            for number_of_shares in (100, 200)
+        ]
+        self.company.issue_shares_bulk(allotments)
+
+        # One event carries the whole batch
+        bulk_event = self.company.__pending_events__[-1]
+        self.assertIsInstance(bulk_event, Company.SharesBulkIssued)
+        self.assertEqual(len(bulk_event.allotments), 2)
+
+        # Both allotments are applied to the aggregate state
+        tonald_holdings = self.company.get_shareholdings(person=self.tonald)
+        self.assertEqual(len(tonald_holdings), 3)
+        self.assertEqual(tonald_holdings[-1].number_of_shares, 200)
+        statement = self.company.statement
+        self.assertEqual(statement['ordinary']['total_shares_issued'], 586)
+
     def test_statement_of_capital_calculations(self):
         ordinary_class = self.company.get_share_class("ordinary")
         self.assertIsInstance(ordinary_class, ShareClass)